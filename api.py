@@ -1,30 +1,86 @@
 from fastapi import FastAPI, HTTPException
-from neo4j import GraphDatabase
 from typing import List, Dict, Optional
 from pydantic import BaseModel
-import google.generativeai as genai 
+from contextlib import asynccontextmanager
 import os
+import threading
 from dotenv import load_dotenv
 import traceback
 import json
+from graph_snapshot import SnapshotStore
+from movie_repository import CATEGORY_QUERIES, MovieRepository
+from result_cache import QueryResultCache, normalize_param
 
 
-app = FastAPI()
-
 load_dotenv()
 
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 neo4j_uri = os.getenv("NEO4J_URI")
 neo4j_user = os.getenv("NEO4J_USER")
 neo4j_password = os.getenv("NEO4J_PASSWORD")
+neo4j_database = os.getenv("NEO4J_DATABASE")
+neo4j_max_pool_size = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+neo4j_acquisition_timeout = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "10"))
+neo4j_warm_connections = int(os.getenv("NEO4J_WARM_CONNECTIONS", "4"))
+result_cache_size = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+result_cache_bytes = int(os.getenv("RESULT_CACHE_BYTES", str(64 * 1024 * 1024)))
+graph_snapshot_dir = os.getenv("GRAPH_SNAPSHOT_DIR")
+
+snapshot_store = SnapshotStore(graph_snapshot_dir) if graph_snapshot_dir else None
+
+_movie_repository = None
+_movie_repository_lock = threading.Lock()
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+_ready = threading.Event()
+
+
+def get_movie_repository() -> MovieRepository:
+    global _movie_repository
+    if _movie_repository is None:
+        with _movie_repository_lock:
+            if _movie_repository is None:
+                _movie_repository = MovieRepository(
+                    neo4j_uri, neo4j_user, neo4j_password,
+                    database=neo4j_database,
+                    max_connection_pool_size=neo4j_max_pool_size,
+                    connection_acquisition_timeout=neo4j_acquisition_timeout,
+                    result_cache=QueryResultCache(result_cache_size, result_cache_bytes) if result_cache_size > 0 else None,
+                )
+    return _movie_repository
+
+
+def warm_up():
+    # Pay for the Gemini SDK import and the Neo4j pool off the request path.
+    import google.generativeai
+    if get_movie_repository().warm_up(neo4j_warm_connections):
+        _ready.set()
+
+
+def start_warm_up():
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _ready.is_set() or (_warm_up_thread is not None and _warm_up_thread.is_alive()):
+            return
+        _warm_up_thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+        _warm_up_thread.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_warm_up()
+    yield
+    if _movie_repository is not None:
+        _movie_repository.close()
+
 
-neo4j_driver = GraphDatabase.driver(
-    neo4j_uri, auth=(neo4j_user, neo4j_password)
-) 
+app = FastAPI(lifespan=lifespan)
 
 
     
 def gemini_configuration(api_key, system_prompt, response_mime_type="text/plain"):
+    import google.generativeai as genai
+
     genai.configure(api_key=api_key)
                     
     generation_config = {
@@ -75,37 +131,23 @@ Return the results in JSON format like this:
     category = categories[0]["category"]
     name = categories[0]["name"]
         
-    query_map = {
-        "Actor": """MATCH (a:Actor)-[:ACTED_IN]->(m:Movie) WHERE toLower(a.name) 
-        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
-        "Director": """MATCH (d:Director)-[:DIRECTED]->(m:Movie) WHERE toLower(d.name) 
-        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
-        "Genre": """MATCH (g:Genre)-[:HAS_GENRE]->(m:Movie) WHERE toLower(g.name) 
-        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
-        "Keyword": """MATCH (k:Keyword)-[:HAS_KEYWORD]->(m:Movie) WHERE toLower(k.name) 
-        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
-        "Movie": """MATCH (m:Movie) WHERE toLower(m.title) CONTAINS toLower($param) 
-        WITH m MATCH (similar:Movie) WHERE toLower(similar.overview) CONTAINS toLower(m.overview) 
-        RETURN similar.movie_id, similar.title, similar.overview, similar.vote_average LIMIT 10"""
-    }
-    
-    query = query_map.get(category)
-    if not query:
+    if category not in CATEGORY_QUERIES:
         return {"error": "Invalid category detected"}
 
-    with neo4j_driver.session() as session:
-        results = session.run(query, {"param": name}).data()
-        return results
+    # Normalized once so every backend (snapshot, cache, Cypher) sees the same term.
+    name = normalize_param(name)
+    snapshot = snapshot_store.current() if snapshot_store else None
+    if snapshot is not None:
+        return snapshot.query(category, name)
+
+    return get_movie_repository().find_movies(category, name)
     
 def get_movie_image_path_from_neo4j(title):
-    query = """
-    MATCH (m:Movie) 
-    WHERE toLower(m.title) = toLower($title)
-    RETURN m.image_path AS image_path LIMIT 1
-    """
-    with neo4j_driver.session() as session:
-        result = session.run(query, {"title": title}).single()
-        return result["image_path"] if result else None
+    snapshot = snapshot_store.current() if snapshot_store else None
+    if snapshot is not None:
+        return snapshot.image_path(title)
+
+    return get_movie_repository().find_image_path(title)
 
 
 
@@ -270,8 +312,24 @@ def extract_movie_title(text, gemini_api_key):
         return [movie.strip() for movie in llm_response.text.strip().split("\n") if movie.strip()]
     return []
 
+@app.get("/healthz")
+def healthz() -> Dict:
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz() -> Dict:
+    snapshot = snapshot_store.current() if snapshot_store else None
+    if _ready.is_set() or snapshot is not None:
+        return {"status": "ready"}
+
+    # Retry in the background if an earlier warm-up failed.
+    start_warm_up()
+    raise HTTPException(status_code=503, detail="Warming up")
+
+
 @app.get("/movies/search/{query}")
-async def search_movies(query: str) -> Dict:
+def search_movies(query: str) -> Dict:
     try:
         results = find_category_and_get_movies(gemini_api_key, query)
         if "error" in results:
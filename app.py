@@ -1,12 +1,12 @@
 import os
 import requests
 import streamlit as st
-import speech_recognition as sr
-from gtts import gTTS
-from audio_recorder_streamlit import audio_recorder
-from firebase_admin import firestore, credentials
-import firebase_admin
+from firebase_client import get_firestore_client
+from speech import TRANSCRIPTION_TIMEOUT, SpeechCache, SpeechNotUnderstoodError, TranscriptionError, get_recognizer, get_synthesizer, speakable_text
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import hashlib
+import time
 import traceback
 
 st.set_page_config(page_title="MovieRag", page_icon="🎬")
@@ -16,16 +16,6 @@ st.title("MovieRag: GraphRAG Movie Recommendation Chatbot")
 api_url = "http://127.0.0.1:8000"
 
 
-if not firebase_admin._apps:
-    try:
-        cred = credentials.Certificate("movie-rag-firebase-adminsdk-fbsvc-a46f1f2595.json")
-        firebase_admin.initialize_app(cred)
-    except Exception as e:
-        st.error(f"Firebase başlatma hatası: {e}")
-        st.stop()
-
-db = firestore.client()
-
 
 def save_chat_to_firestore(username, chat_id, messages):
     try:
@@ -38,7 +28,7 @@ def save_chat_to_firestore(username, chat_id, messages):
                 storable_msg["images"] = {title: path for title, path in storable_msg.get("images", {}).items() if path}
             storable_messages.append(storable_msg)
         
-        doc_ref = db.collection("users").document(username).collection("chats").document(chat_id)
+        doc_ref = get_firestore_client().collection("users").document(username).collection("chats").document(chat_id)
         doc_ref.set({"messages": storable_messages, "created_at": chat_id})
     except Exception as e:
         st.error(f"Sohbet kaydedilirken hata: {e}")
@@ -47,7 +37,7 @@ def save_chat_to_firestore(username, chat_id, messages):
 def load_user_chats(username):
     try:
         chat_histories = {}
-        chats_ref = db.collection("users").document(username).collection("chats")
+        chats_ref = get_firestore_client().collection("users").document(username).collection("chats")
         for chat_doc in chats_ref.stream():
             chat_histories[chat_doc.id] = chat_doc.to_dict().get("messages", [])
         return chat_histories
@@ -58,7 +48,7 @@ def load_user_chats(username):
 
 def delete_chat_from_firestore(username, chat_id):
     try:
-        doc_ref = db.collection("users").document(username).collection("chats").document(chat_id)
+        doc_ref = get_firestore_client().collection("users").document(username).collection("chats").document(chat_id)
         doc_ref.delete()
         return True
     except Exception as e:
@@ -85,22 +75,129 @@ if "confirm_delete" not in st.session_state:
     st.session_state["confirm_delete"] = None
 
 
-def recognize_speech():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("Konuşmaya başlayabilirsiniz...")
-        try:
-            audio = recognizer.listen(source, timeout=5)
-            text = recognizer.recognize_google(audio, language="tr-TR")
-            st.success(f"Saptanan metin: {text}")
-            return text
-        except sr.UnknownValueError:
-            st.error("Ses anlaşılamadı, lütfen tekrar deneyin.")
-        except sr.RequestError as e:
-            st.error(f"Ses tanıma servisiyle ilgili bir sorun oluştu: {e}")
+@st.cache_resource
+def get_audio_recorder():
+    # Voice input is optional; hide the recorder if the component is missing.
+    try:
+        from audio_recorder_streamlit import audio_recorder
+    except ImportError:
+        return None
+    return audio_recorder
+
+
+@st.cache_resource
+def get_speech_recognizer():
+    # Like the recorder, voice input degrades instead of crashing the page
+    # when the backend is missing or misconfigured.
+    try:
+        return get_recognizer(os.getenv("MOVIERAG_SPEECH_RECOGNIZER", "google"))
+    except (ImportError, ValueError) as e:
+        print(f"Sesli giriş devre dışı: {e}")
         return None
 
 
+@st.cache_resource
+def get_speech_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="speech")
+
+
+@st.cache_resource
+def get_speech_cache():
+    # Spoken playback is optional; it is disabled when the synthesizer is
+    # set to "off" or its package is not installed.
+    name = os.getenv("MOVIERAG_TTS_SYNTHESIZER", "gtts")
+    if name == "off":
+        return None
+    try:
+        synthesizer = get_synthesizer(name, os.getenv("MOVIERAG_TTS_LANGUAGE"))
+    except (ImportError, ValueError) as e:
+        print(f"Sesli yanıt devre dışı: {e}")
+        return None
+    return SpeechCache(synthesizer)
+
+
+def render_speech(text):
+    # Plays the cached clip, or starts synthesis in the background and
+    # returns True while it is in flight. Old messages pick the clip up on a
+    # later rerun.
+    speech_cache = get_speech_cache()
+    if speech_cache is None:
+        return False
+
+    text = speakable_text(text)
+    if not text:
+        return False
+
+    audio = speech_cache.get(text)
+    if audio is not None:
+        st.audio(audio, format=speech_cache.synthesizer.audio_format)
+        return False
+    return speech_cache.submit(text) is not None
+
+
+@st.fragment(run_every=1)
+def await_speech(text):
+    # Polls without blocking the script; once synthesis has finished (or
+    # failed) a full rerun renders the clip from the cache.
+    speech_cache = get_speech_cache()
+    if speech_cache is None or not speech_cache.pending(speakable_text(text)):
+        st.rerun()
+
+
+def transcribe_recording(audio_bytes):
+    # The recorder keeps returning its last clip on every rerun; only new
+    # recordings are transcribed.
+    audio_hash = hashlib.sha256(audio_bytes).hexdigest()
+    if st.session_state.get("last_audio_hash") == audio_hash:
+        return
+    st.session_state["last_audio_hash"] = audio_hash
+
+    recognizer = get_speech_recognizer()
+    if recognizer is None:
+        st.error("Ses tanıma kullanılamıyor, sesli giriş kapatıldı.")
+        st.session_state["voice_input_disabled"] = True
+        return
+
+    # Transcription runs on the executor; await_transcription polls it.
+    st.session_state["transcription"] = (
+        get_speech_executor().submit(recognizer.transcribe, audio_bytes),
+        time.monotonic(),
+    )
+
+
+@st.fragment(run_every=0.5)
+def await_transcription():
+    # Polls without blocking the script. When the transcription ends, the
+    # text (or the error) is handed to a full rerun through session state.
+    future, submitted_at = st.session_state["transcription"]
+    if not future.done():
+        if time.monotonic() - submitted_at < TRANSCRIPTION_TIMEOUT + 5:
+            st.caption("Ses çözümleniyor...")
+            return
+        # The backend timeout should have fired already; stop waiting.
+        st.session_state["voice_error"] = "Ses tanıma zaman aşımına uğradı, lütfen tekrar deneyin."
+    else:
+        try:
+            st.session_state["voice_query"] = future.result()
+        except SpeechNotUnderstoodError:
+            st.session_state["voice_error"] = "Ses anlaşılamadı, lütfen tekrar deneyin."
+        except TranscriptionError as e:
+            st.session_state["voice_error"] = f"Ses tanıma servisiyle ilgili bir sorun oluştu: {e}"
+    del st.session_state["transcription"]
+    st.rerun()
+
+
+def take_voice_query():
+    voice_error = st.session_state.pop("voice_error", None)
+    if voice_error:
+        st.error(voice_error)
+
+    text = st.session_state.pop("voice_query", None)
+    if text:
+        st.success(f"Saptanan metin: {text}")
+    return text
+
+
 def fetch_movie_recommendations(query):
     try:
         response = requests.get(f"{api_url}/movies/search/{query}")
@@ -219,54 +316,71 @@ for message in st.session_state["messages"]:
                     except Exception as e:
                         print(f"Resim yüklenirken hata oluştu: {e}")
 
+        if message["role"] == "assistant" and isinstance(message["content"], str):
+            render_speech(message["content"])
+
 
 user_query = st.chat_input("Hangi filmi izlemek istersin?")
-record_audio = audio_recorder()
-
-if user_query or record_audio:
-    if record_audio and not user_query:
-        user_query = recognize_speech()
-
-    if user_query:
-        with st.chat_message("user"):
-            st.write(user_query)
-
-        st.session_state["messages"].append({"role": "user", "content": user_query})
-
-        recommendations, images = fetch_movie_recommendations(user_query)
-        if recommendations:
-            with st.chat_message("assistant"):
-                st.write(recommendations)
-                
-                
-                if images:
-                    for title, image_path in images.items():
-                        if image_path:
-                            try:
-                                st.image(image_path, caption=title, use_column_width=True)
-                            except Exception as e:
-                                print(f"Resim yüklenirken hata oluştu: {e}")
+audio_recorder = None if st.session_state.get("voice_input_disabled") else get_audio_recorder()
+record_audio = audio_recorder() if audio_recorder else None
 
+speech_pending = False
+
+if record_audio and not user_query:
+    transcribe_recording(record_audio)
+if not user_query:
+    user_query = take_voice_query()
+
+if user_query:
+    with st.chat_message("user"):
+        st.write(user_query)
+
+    st.session_state["messages"].append({"role": "user", "content": user_query})
+
+    recommendations, images = fetch_movie_recommendations(user_query)
+    if recommendations:
+        with st.chat_message("assistant"):
+            st.write(recommendations)
+            
             
-            st.session_state["messages"].append({
-                "role": "assistant", 
-                "content": recommendations,
-                "images": images
-            })
+            if images:
+                for title, image_path in images.items():
+                    if image_path:
+                        try:
+                            st.image(image_path, caption=title, use_column_width=True)
+                        except Exception as e:
+                            print(f"Resim yüklenirken hata oluştu: {e}")
 
-        else:
-            st.error("Öneri bulunamadı.")
+            speech_pending = render_speech(recommendations)
 
         
-        if st.session_state["current_chat"]:
-            st.session_state["chat_histories"][st.session_state["current_chat"]] = st.session_state["messages"]
-            save_chat_to_firestore(username, st.session_state["current_chat"], st.session_state["messages"])
-        else:
-            
-            new_chat_id = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            st.session_state["current_chat"] = new_chat_id
-            st.session_state["chat_histories"][new_chat_id] = st.session_state["messages"]
-            save_chat_to_firestore(username, new_chat_id, st.session_state["messages"])
+        st.session_state["messages"].append({
+            "role": "assistant", 
+            "content": recommendations,
+            "images": images
+        })
+
+    else:
+        st.error("Öneri bulunamadı.")
+
+    
+    if st.session_state["current_chat"]:
+        st.session_state["chat_histories"][st.session_state["current_chat"]] = st.session_state["messages"]
+        save_chat_to_firestore(username, st.session_state["current_chat"], st.session_state["messages"])
+    else:
+        
+        new_chat_id = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        st.session_state["current_chat"] = new_chat_id
+        st.session_state["chat_histories"][new_chat_id] = st.session_state["messages"]
+        save_chat_to_firestore(username, new_chat_id, st.session_state["messages"])
+
+    # Runs last: its rerun must not cut off saving the chat above.
+    if speech_pending:
+        await_speech(recommendations)
+
+# Also last, so a finished transcription cannot cut off a typed query.
+if "transcription" in st.session_state:
+    await_transcription()
 
 
 
@@ -1,9 +1,93 @@
+import argparse
+import csv
+import hashlib
+import itertools
+import os
+import re
+import time
 import numpy as np
 import pandas as pd
 from neo4j import GraphDatabase
 import traceback
 from tqdm import tqdm
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from graph_snapshot import write_snapshot
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Parsed catalogs are cached as Parquet keyed by the source file's hash.
+# Bump CATALOG_CACHE_VERSION whenever parse_csv changes its output.
+CATALOG_CACHE_DIR = ".catalog_cache"
+CATALOG_CACHE_VERSION = 1
+CATALOG_LIST_COLUMNS = ['cast', 'genres', 'keywords']
+
+NEO4J_INDEXES = [
+    "CREATE INDEX movie_id IF NOT EXISTS FOR (m:Movie) ON (m.movie_id)",
+    "CREATE INDEX actor_name IF NOT EXISTS FOR (a:Actor) ON (a.name)",
+    "CREATE INDEX director_name IF NOT EXISTS FOR (d:Director) ON (d.name)",
+    "CREATE INDEX genre IF NOT EXISTS FOR (g:Genre) ON (g.name)",
+    "CREATE INDEX keyword IF NOT EXISTS FOR (k:Keyword) ON (k.name)",
+]
+
+# Node and relationship files for `neo4j-admin database import full`.
+# List properties use BULK_IMPORT_ARRAY_DELIMITER instead of the default ';'.
+BULK_IMPORT_ARRAY_DELIMITER = "|"
+
+BULK_IMPORT_NODES = {
+    "Actor": ("actor_nodes.csv", "cast"),
+    "Director": ("director_nodes.csv", "director"),
+    "Genre": ("genre_nodes.csv", "genres"),
+    "Keyword": ("keyword_nodes.csv", "keywords"),
+}
+
+BULK_IMPORT_RELATIONSHIPS = {
+    "Actor": ("acted_in.csv", "ACTED_IN"),
+    "Director": ("directed.csv", "DIRECTED"),
+    "Genre": ("has_genre.csv", "HAS_GENRE"),
+    "Keyword": ("has_keyword.csv", "HAS_KEYWORD"),
+}
+
+BULK_IMPORT_MOVIE_HEADER = [
+    "movie_id:ID(Movie)", "title", "genres:string[]", "overview", "actors:string[]",
+    "director", "release_date", "vote_average:float", "image_path", ":LABEL",
+]
+
+
+def _file_hash(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def catalog_cache_path(filepath: str, cache_dir: str = CATALOG_CACHE_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(cache_dir, f"{stem}-v{CATALOG_CACHE_VERSION}-{_file_hash(filepath)[:16]}.parquet")
+
+
+def load_catalog_table(cache_path: str):
+    # Memory-mapped Arrow table; list columns stay native list<string>.
+    if pq is None:
+        raise ImportError("pyarrow is required to read the catalog cache")
+    return pq.read_table(cache_path, memory_map=True)
+
+
+def _bulk_import_value(value) -> str:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return BULK_IMPORT_ARRAY_DELIMITER.join(str(v).replace(BULK_IMPORT_ARRAY_DELIMITER, " ") for v in value)
+    if value is None or pd.isna(value):
+        return ""
+    return str(value)
+
+
+def _bulk_import_names(value) -> List[str]:
+    names = value if isinstance(value, (list, tuple, np.ndarray)) else [value]
+    # The importer rejects empty IDs, so blank entries are dropped.
+    return [str(name) for name in names if not pd.isna(name) and str(name) != ""]
 
 class DataPreprocessor:
     def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str):
@@ -12,10 +96,17 @@ class DataPreprocessor:
             neo4j_uri, auth=(neo4j_user, neo4j_password)
         )
         
-    def parse_csv(self, filepath: str) -> pd.DataFrame:
+    def parse_csv(self, filepath: str, cache_dir: Optional[str] = CATALOG_CACHE_DIR) -> pd.DataFrame:
         
         try:
             print("\nStep 1: Loading and validating CSV...")
+
+            cache_path = None
+            if cache_dir and pq is not None:
+                cache_path = catalog_cache_path(filepath, cache_dir)
+                df = self._read_catalog_cache(cache_path)
+                if df is not None:
+                    return df
             
             
             df = pd.read_csv(filepath)
@@ -44,6 +135,9 @@ class DataPreprocessor:
             print("\nSample data after processing:")
             print(df[['movie_id', 'title', 'cast','genres','keywords']].head())
             print(f"\nLoaded {len(df)} records from CSV")
+
+            if cache_path:
+                self._write_catalog_cache(df, cache_path)
             
             return df
         
@@ -53,6 +147,54 @@ class DataPreprocessor:
             traceback.print_exc()
             raise
       
+    def _read_catalog_cache(self, cache_path: str) -> Optional[pd.DataFrame]:
+
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            df = load_catalog_table(cache_path).to_pandas()
+            for column in CATALOG_LIST_COLUMNS:
+                df[column] = df[column].apply(list)
+            print(f"\nLoaded {len(df)} records from cache {cache_path}")
+            return df
+
+        except Exception as e:
+            # A corrupt entry is dropped and the CSV is parsed instead.
+            print(f"Could not read catalog cache {cache_path}: {str(e)}")
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+
+    def _write_catalog_cache(self, df: pd.DataFrame, cache_path: str):
+
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            cache_dir = os.path.dirname(cache_path)
+            os.makedirs(cache_dir, exist_ok=True)
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, cache_path)
+
+            # Entries for older versions of the same source are no longer reachable.
+            stem = os.path.basename(cache_path).rsplit("-", 2)[0]
+            stale_entry = re.compile(rf"^{re.escape(stem)}-v\d+-[0-9a-f]{{16}}\.parquet$")
+            # Temp files left by interrupted writes; recent ones may still be in use.
+            stale_tmp = re.compile(rf"^{re.escape(stem)}-v\d+-[0-9a-f]{{16}}\.parquet\.\d+\.tmp$")
+            for name in os.listdir(cache_dir):
+                path = os.path.join(cache_dir, name)
+                if stale_entry.match(name) and name != os.path.basename(cache_path):
+                    os.remove(path)
+                elif stale_tmp.match(name) and time.time() - os.path.getmtime(path) > 3600:
+                    os.remove(path)
+            print(f"\nCached parsed catalog to {cache_path}")
+
+        except Exception as e:
+            # The cache is an optimization; parsing already succeeded.
+            print(f"Could not write catalog cache: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+      
     def load_neo4j(self,df:pd.DataFrame) :
 
         try:
@@ -64,11 +206,8 @@ class DataPreprocessor:
                     
                     
                     print("\nCreating indexes...")
-                    session.run("CREATE INDEX movie_id IF NOT EXISTS FOR (m:Movie) ON (m.movie_id)")
-                    session.run("CREATE INDEX actor_name IF NOT EXISTS FOR (a:Actor) ON (a.name)")
-                    session.run("CREATE INDEX director_name IF NOT EXISTS FOR (d:Director) ON (d.name)")
-                    session.run("CREATE INDEX genre IF NOT EXISTS FOR (g:Genre) ON (g.name)")
-                    session.run("CREATE INDEX keyword IF NOT EXISTS FOR (k:Keyword) ON (k.name)")
+                    for index_query in NEO4J_INDEXES:
+                        session.run(index_query)
                     
                     df["keywords"].fillna("", inplace=True) 
                     df["cast"].fillna("", inplace=True) 
@@ -154,6 +293,12 @@ class DataPreprocessor:
                                     'movie_id': row['movie_id']
                                 })
                             
+                    # Lets the API drop query results cached from the previous load.
+                    session.run(
+                        "MERGE (g:GraphGeneration {name: 'current'}) SET g.generation = $generation",
+                        {'generation': time.time_ns()}
+                    )
+                            
                     movie_count = session.run("MATCH (m:Movie) RETURN count(m) as count").single()["count"]
                     actor_count = session.run("MATCH (a:Actor) RETURN count(a) as count").single()["count"]
                     director_count = session.run("MATCH (d:Director) RETURN count(d) as count").single()["count"]
@@ -181,15 +326,123 @@ class DataPreprocessor:
             print("\nDetailed error information:")
             traceback.print_exc()
             raise
-        
-    
-    
-        
+
+    def export_snapshot(self, df: pd.DataFrame, snapshot_dir: str) -> str:
+
+        try:
+            print("\nStep 3: Exporting graph snapshot...")
+            version = write_snapshot(df, snapshot_dir)
+            print(f"\nPublished graph snapshot {version} to {snapshot_dir}")
+            return version
+
+        except Exception as e:
+            print(f"Error exporting graph snapshot: {str(e)}")
+            print("\nDetailed error information:")
+            traceback.print_exc()
+            raise
+
+    def export_bulk_import(self, df: pd.DataFrame, output_dir: str, database: str = "neo4j") -> str:
+
+        try:
+            print("\nExporting neo4j-admin import files...")
+            os.makedirs(output_dir, exist_ok=True)
+
+            files = []
+            writers = {}
+            try:
+                def open_writer(filename: str, header: List[str]):
+                    f = open(os.path.join(output_dir, filename), "w", newline="", encoding="utf-8")
+                    files.append(f)
+                    writer = csv.writer(f)
+                    writer.writerow(header)
+                    return writer
+
+                movie_writer = open_writer("movie_nodes.csv", BULK_IMPORT_MOVIE_HEADER)
+                generation_writer = open_writer("graph_generation.csv", ["name:ID(GraphGeneration)", "generation:long", ":LABEL"])
+                generation_writer.writerow(["current", time.time_ns(), "GraphGeneration"])
+                for label, (filename, _) in BULK_IMPORT_NODES.items():
+                    writers[label] = open_writer(filename, [f"name:ID({label})", ":LABEL"])
+                for label, (filename, _) in BULK_IMPORT_RELATIONSHIPS.items():
+                    writers[filename] = open_writer(filename, [f":START_ID({label})", ":END_ID(Movie)", ":TYPE"])
+
+                # Rows are written as they are read; only the seen IDs are kept in memory.
+                seen_movies = set()
+                seen_nodes = {label: set() for label in BULK_IMPORT_NODES}
+                # Columns are zipped row by row rather than materialized as records.
+                columns = ["movie_id", "title", "genres", "overview", "cast", "director",
+                           "release_date", "vote_average", "image_path", "keywords"]
+                column_values = [df[column] if column in df else itertools.repeat(None) for column in columns]
+                for values in tqdm(zip(*column_values), total=len(df), desc="Exporting Movies"):
+                    row = dict(zip(columns, values))
+                    movie_id = _bulk_import_value(row["movie_id"])
+                    if not movie_id or movie_id in seen_movies:
+                        continue
+                    seen_movies.add(movie_id)
+
+                    movie_writer.writerow([
+                        movie_id,
+                        _bulk_import_value(row["title"]),
+                        _bulk_import_value(row["genres"]),
+                        _bulk_import_value(row["overview"]),
+                        _bulk_import_value(row["cast"]),
+                        _bulk_import_value(row["director"]),
+                        _bulk_import_value(row["release_date"]),
+                        _bulk_import_value(row["vote_average"]),
+                        _bulk_import_value(row["image_path"]),
+                        "Movie",
+                    ])
+
+                    for label, (_, column) in BULK_IMPORT_NODES.items():
+                        relationship_file, relationship_type = BULK_IMPORT_RELATIONSHIPS[label]
+                        for name in dict.fromkeys(_bulk_import_names(row[column])):
+                            if name not in seen_nodes[label]:
+                                seen_nodes[label].add(name)
+                                writers[label].writerow([name, label])
+                            writers[relationship_file].writerow([name, movie_id, relationship_type])
+            finally:
+                for f in files:
+                    f.close()
+
+            print(f"\nExported {len(seen_movies)} movies")
+            for label, names in seen_nodes.items():
+                print(f"- {len(names)} {label.lower()} nodes")
+
+            command = " ".join(
+                # The target database usually exists already (and holds the old
+                # store in a recovery), so the import has to replace it.
+                [f"neo4j-admin database import full {database}",
+                 "--overwrite-destination=true",
+                 f"--array-delimiter='{BULK_IMPORT_ARRAY_DELIMITER}'",
+                 "--multiline-fields=true",
+                 f"--nodes=Movie={os.path.join(output_dir, 'movie_nodes.csv')}",
+                 f"--nodes=GraphGeneration={os.path.join(output_dir, 'graph_generation.csv')}"]
+                + [f"--nodes={label}={os.path.join(output_dir, filename)}" for label, (filename, _) in BULK_IMPORT_NODES.items()]
+                + [f"--relationships={relationship_type}={os.path.join(output_dir, filename)}"
+                   for filename, relationship_type in BULK_IMPORT_RELATIONSHIPS.values()]
+            )
+            print("\nImport with (database stopped):")
+            print(command)
+            print("\nThen create the indexes load_neo4j would have created:")
+            for index_query in NEO4J_INDEXES:
+                print(f"{index_query};")
+            return command
+
+        except Exception as e:
+            print(f"Error exporting bulk import files: {str(e)}")
+            print("\nDetailed error information:")
+            traceback.print_exc()
+            raise
+
     def close(self):
         self.neo4j_driver.close()
         
         
 def main():
+
+    parser = argparse.ArgumentParser(description="Load movies.csv into Neo4j")
+    parser.add_argument("--bulk-import-dir", help="write neo4j-admin import CSVs to this directory instead of loading transactionally")
+    parser.add_argument("--bulk-import-database", default="neo4j", help="database the printed neo4j-admin command imports into")
+    args = parser.parse_args()
    
     processor = DataPreprocessor(
         neo4j_uri="neo4j+s://7a408134.databases.neo4j.io",
@@ -199,7 +452,11 @@ def main():
     
     try:
         df = processor.parse_csv('movies.csv')
-        processor.load_neo4j(df)
+        if args.bulk_import_dir:
+            processor.export_bulk_import(df, args.bulk_import_dir, args.bulk_import_database)
+        else:
+            processor.load_neo4j(df)
+        processor.export_snapshot(df, 'graph_snapshot')
         
     except Exception as e:
         print(f"Error in main process: {str(e)}")
@@ -0,0 +1,21 @@
+import firebase_admin
+import streamlit as st
+from firebase_admin import credentials, firestore
+
+
+FIREBASE_CREDENTIALS = "movie-rag-firebase-adminsdk-fbsvc-a46f1f2595.json"
+
+
+@st.cache_resource
+def get_firebase_app():
+    # Streamlit re-executes page scripts on every rerun; the app is created
+    # once per process and shared by all sessions.
+    if not firebase_admin._apps:
+        return firebase_admin.initialize_app(credentials.Certificate(FIREBASE_CREDENTIALS))
+    return firebase_admin.get_app()
+
+
+@st.cache_resource
+def get_firestore_client():
+    get_firebase_app()
+    return firestore.client()
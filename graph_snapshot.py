@@ -0,0 +1,286 @@
+import datetime
+import mmap
+import os
+import shutil
+import threading
+import traceback
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Snapshot layout on disk:
+#   <root>/CURRENT             -> name of the published version directory
+#   <root>/<version>/...       -> .npy arrays (memory-mapped) and .bin string blobs
+#
+# Entities are integer coded per label and relationships are stored as CSR
+# arrays in both directions (entity -> movies and movie -> entities).
+
+CURRENT_FILE = "CURRENT"
+
+RELATIONSHIPS = {
+    "Actor": ("actor", "cast"),
+    "Director": ("director", "director"),
+    "Genre": ("genre", "genres"),
+    "Keyword": ("keyword", "keywords"),
+}
+
+MOVIE_COLUMNS = ["movie_id", "title", "overview", "director", "image_path"]
+LOWERED_COLUMNS = ["title", "overview"]
+
+
+def _clean(value) -> str:
+    if isinstance(value, str):
+        return value.replace("\0", "")
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return str(value).replace("\0", "")
+
+
+def _write_strings(prefix: str, values: List[str]):
+    # Strings are stored NUL terminated in one blob so that substring search
+    # can never match across two entries.
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    position = 0
+    with open(prefix + ".bin", "wb") as f:
+        for i, value in enumerate(values):
+            encoded = value.encode("utf-8") + b"\0"
+            f.write(encoded)
+            position += len(encoded)
+            offsets[i + 1] = position
+    np.save(prefix + ".idx.npy", offsets)
+
+
+def _write_csr(prefix: str, rows: List[List[int]]):
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    indices = np.fromiter((j for row in rows for j in row), dtype=np.int32, count=int(indptr[-1]))
+    np.save(prefix + ".indptr.npy", indptr)
+    np.save(prefix + ".indices.npy", indices)
+
+
+def _entity_names(value) -> List[str]:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_clean(v) for v in value]
+    return [_clean(value)]
+
+
+def write_snapshot(df: "pd.DataFrame", root: str, keep: int = 2) -> str:
+    # pandas is only needed on the export side; the API imports this module
+    # for SnapshotStore and should not pay for it at startup.
+    import pandas as pd
+
+    os.makedirs(root, exist_ok=True)
+    version = datetime.datetime.now().strftime("%Y%m%d%H%M%S%f")
+    staging = os.path.join(root, f".{version}.tmp")
+    os.makedirs(staging)
+
+    try:
+        for column in MOVIE_COLUMNS:
+            values = [_clean(v) for v in df[column]]
+            _write_strings(os.path.join(staging, column), values)
+            if column in LOWERED_COLUMNS:
+                _write_strings(os.path.join(staging, f"{column}.lower"), [v.lower() for v in values])
+
+        vote_average = pd.to_numeric(df["vote_average"], errors="coerce").to_numpy(dtype=np.float64)
+        np.save(os.path.join(staging, "vote_average.npy"), vote_average)
+
+        for label, column in RELATIONSHIPS.values():
+            codes: Dict[str, int] = {}
+            movie_to_entities = []
+            for value in df[column]:
+                movie_to_entities.append([codes.setdefault(name, len(codes)) for name in _entity_names(value)])
+
+            entity_to_movies = [[] for _ in range(len(codes))]
+            for movie_index, entities in enumerate(movie_to_entities):
+                for entity in entities:
+                    entity_to_movies[entity].append(movie_index)
+
+            names = list(codes)
+            _write_strings(os.path.join(staging, f"{label}.names"), names)
+            _write_strings(os.path.join(staging, f"{label}.lower"), [name.lower() for name in names])
+            _write_csr(os.path.join(staging, f"{label}.movies"), entity_to_movies)
+            _write_csr(os.path.join(staging, f"{label}.by_movie"), movie_to_entities)
+
+        os.rename(staging, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Publishing is a single atomic rename of the pointer file.
+    pointer_tmp = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(pointer_tmp, "w") as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_FILE))
+
+    versions = sorted(
+        name for name in os.listdir(root)
+        if not name.startswith(".") and name != CURRENT_FILE and os.path.isdir(os.path.join(root, name))
+    )
+    for old_version in versions[:-(keep + 1)]:
+        shutil.rmtree(os.path.join(root, old_version), ignore_errors=True)
+
+    return version
+
+
+class _StringColumn:
+    def __init__(self, prefix: str):
+        self.offsets = np.load(prefix + ".idx.npy", mmap_mode="r")
+        with open(prefix + ".bin", "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start = int(self.offsets[index])
+        end = int(self.offsets[index + 1]) - 1
+        return self.data[start:end].decode("utf-8")
+
+    def contains(self, needle: str):
+        # Yields the index of every entry containing needle, in storage order.
+        encoded = needle.replace("\0", "").encode("utf-8")
+        position = self.data.find(encoded)
+        while position != -1 and position < len(self.data):
+            index = int(np.searchsorted(self.offsets, position, side="right")) - 1
+            yield index
+            position = self.data.find(encoded, int(self.offsets[index + 1]))
+
+    def equals(self, needle: str):
+        encoded_length = len(needle.replace("\0", "").encode("utf-8"))
+        for index in self.contains(needle):
+            if int(self.offsets[index + 1]) - 1 - int(self.offsets[index]) == encoded_length:
+                yield index
+
+
+class _Relationship:
+    def __init__(self, prefix: str):
+        self.names = _StringColumn(prefix + ".names")
+        self.lower = _StringColumn(prefix + ".lower")
+        self.movie_indptr = np.load(prefix + ".movies.indptr.npy", mmap_mode="r")
+        self.movie_indices = np.load(prefix + ".movies.indices.npy", mmap_mode="r")
+        self.entity_indptr = np.load(prefix + ".by_movie.indptr.npy", mmap_mode="r")
+        self.entity_indices = np.load(prefix + ".by_movie.indices.npy", mmap_mode="r")
+
+    def movies_for(self, entity: int):
+        return self.movie_indices[self.movie_indptr[entity]:self.movie_indptr[entity + 1]]
+
+    def names_for_movie(self, movie: int) -> List[str]:
+        entities = self.entity_indices[self.entity_indptr[movie]:self.entity_indptr[movie + 1]]
+        return [self.names[int(entity)] for entity in entities]
+
+
+class GraphSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self.columns = {column: _StringColumn(os.path.join(path, column)) for column in MOVIE_COLUMNS}
+        self.lowered = {column: _StringColumn(os.path.join(path, f"{column}.lower")) for column in LOWERED_COLUMNS}
+        self.vote_average = np.load(os.path.join(path, "vote_average.npy"), mmap_mode="r")
+        self.relationships = {
+            category: _Relationship(os.path.join(path, label))
+            for category, (label, _) in RELATIONSHIPS.items()
+        }
+
+    def _vote_average(self, movie: int) -> Optional[float]:
+        value = float(self.vote_average[movie])
+        return None if np.isnan(value) else value
+
+    def _image_path(self, movie: int) -> Optional[str]:
+        return self.columns["image_path"][movie] or None
+
+    def _movie_row(self, movie: int) -> Dict:
+        return {
+            "m.movie_id": self.columns["movie_id"][movie],
+            "m.title": self.columns["title"][movie],
+            "m.overview": self.columns["overview"][movie],
+            "m.genres": self.relationships["Genre"].names_for_movie(movie),
+            "m.actors": self.relationships["Actor"].names_for_movie(movie),
+            "m.director": self.columns["director"][movie],
+            "m.vote_average": self._vote_average(movie),
+            "m.image_path": self._image_path(movie),
+        }
+
+    def _similar_row(self, movie: int) -> Dict:
+        return {
+            "similar.movie_id": self.columns["movie_id"][movie],
+            "similar.title": self.columns["title"][movie],
+            "similar.overview": self.columns["overview"][movie],
+            "similar.vote_average": self._vote_average(movie),
+        }
+
+    def query(self, category: str, param: str, limit: int = 10) -> Optional[List[Dict]]:
+        # Mirrors movie_repository.CATEGORY_QUERIES, one row per matched path.
+        needle = param.lower()
+        results = []
+
+        if category == "Movie":
+            overviews = self.lowered["overview"]
+            for movie in self.lowered["title"].contains(needle):
+                for similar in overviews.contains(overviews[movie]):
+                    results.append(self._similar_row(similar))
+                    if len(results) >= limit:
+                        return results
+            return results
+
+        relationship = self.relationships.get(category)
+        if relationship is None:
+            return None
+
+        for entity in relationship.lower.contains(needle):
+            for movie in relationship.movies_for(entity):
+                results.append(self._movie_row(int(movie)))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def image_path(self, title: str) -> Optional[str]:
+        for movie in self.lowered["title"].equals(title.lower()):
+            return self._image_path(movie)
+        return None
+
+
+class SnapshotStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._snapshot: Optional[GraphSnapshot] = None
+
+    def current(self) -> Optional[GraphSnapshot]:
+        pointer = os.path.join(self.root, CURRENT_FILE)
+        try:
+            stat = os.stat(pointer)
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            stamp = None
+
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._swap(pointer, stamp)
+        return self._snapshot
+
+    def _swap(self, pointer: str, stamp):
+        if stamp is None:
+            self._snapshot = None
+            self._stamp = None
+            return
+        try:
+            with open(pointer) as f:
+                version = f.read().strip()
+            snapshot = GraphSnapshot(os.path.join(self.root, version))
+        except Exception as e:
+            # Keep serving the previous snapshot (or Neo4j) if the new one is unreadable.
+            print(f"Error loading graph snapshot: {str(e)}")
+            traceback.print_exc()
+            self._stamp = stamp
+            return
+        print(f"Serving graph snapshot {version}")
+        self._snapshot = snapshot
+        self._stamp = stamp
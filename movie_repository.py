@@ -0,0 +1,141 @@
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from neo4j import GraphDatabase, READ_ACCESS
+
+from result_cache import QueryResultCache, normalize_param
+
+
+CATEGORY_QUERIES = {
+    "Actor": """MATCH (a:Actor)-[:ACTED_IN]->(m:Movie) WHERE toLower(a.name)
+        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
+    "Director": """MATCH (d:Director)-[:DIRECTED]->(m:Movie) WHERE toLower(d.name)
+        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
+    "Genre": """MATCH (g:Genre)-[:HAS_GENRE]->(m:Movie) WHERE toLower(g.name)
+        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
+    "Keyword": """MATCH (k:Keyword)-[:HAS_KEYWORD]->(m:Movie) WHERE toLower(k.name)
+        CONTAINS toLower($param) RETURN m.movie_id, m.title, m.overview,m.genres,m.actors,m.director, m.vote_average,m.image_path LIMIT 10""",
+    "Movie": """MATCH (m:Movie) WHERE toLower(m.title) CONTAINS toLower($param)
+        WITH m MATCH (similar:Movie) WHERE toLower(similar.overview) CONTAINS toLower(m.overview)
+        RETURN similar.movie_id, similar.title, similar.overview, similar.vote_average LIMIT 10"""
+}
+
+IMAGE_PATH_QUERY = """
+    MATCH (m:Movie)
+    WHERE toLower(m.title) = toLower($title)
+    RETURN m.image_path AS image_path LIMIT 1
+    """
+
+# DataPreprocessor stamps a new generation on this node after every load.
+GRAPH_GENERATION_QUERY = """
+    MATCH (g:GraphGeneration {name: 'current'})
+    RETURN g.generation AS generation LIMIT 1
+    """
+
+# Matches nothing, so warm-up runs only pay for planning and a cheap scan.
+WARM_UP_PARAM = "\u0000movierag-warm-up\u0000"
+
+
+def _fetch_all(tx, query: str, params: Dict) -> List[Dict]:
+    return tx.run(query, params).data()
+
+
+def _fetch_single(tx, query: str, params: Dict) -> Optional[Dict]:
+    record = tx.run(query, params).single()
+    return record.data() if record else None
+
+
+class MovieRepository:
+    def __init__(
+        self,
+        neo4j_uri: str,
+        neo4j_user: str,
+        neo4j_password: str,
+        database: Optional[str] = None,
+        max_connection_pool_size: int = 50,
+        connection_acquisition_timeout: float = 10.0,
+        max_transaction_retry_time: float = 15.0,
+        max_connection_lifetime: float = 3600.0,
+        liveness_check_timeout: Optional[float] = 30.0,
+        result_cache: Optional[QueryResultCache] = None,
+        generation_check_interval: float = 1.0,
+    ):
+        self.database = database
+        self.result_cache = result_cache
+        self.generation_check_interval = generation_check_interval
+        self._generation = None
+        self._generation_checked_at = None
+        self.max_connection_pool_size = max_connection_pool_size
+        self.neo4j_driver = GraphDatabase.driver(
+            neo4j_uri,
+            auth=(neo4j_user, neo4j_password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            max_transaction_retry_time=max_transaction_retry_time,
+            max_connection_lifetime=max_connection_lifetime,
+            liveness_check_timeout=liveness_check_timeout,
+        )
+
+    def _read(self, work, *args):
+        # Managed read transactions are routed to replicas on clustered
+        # deployments and retried by the driver on transient errors.
+        with self.neo4j_driver.session(database=self.database, default_access_mode=READ_ACCESS) as session:
+            return session.execute_read(work, *args)
+
+    def graph_generation(self):
+        # Re-read at most once per generation_check_interval so cache hits
+        # stay free of round trips while a re-ingest is noticed within it.
+        now = time.monotonic()
+        if self._generation_checked_at is None or now - self._generation_checked_at >= self.generation_check_interval:
+            record = self._read(_fetch_single, GRAPH_GENERATION_QUERY, {})
+            self._generation = record["generation"] if record else None
+            self._generation_checked_at = now
+        return self._generation
+
+    def find_movies(self, category: str, param: str) -> Optional[List[Dict]]:
+        query = CATEGORY_QUERIES.get(category)
+        if not query:
+            return None
+        param = normalize_param(param)
+        if self.result_cache is None:
+            return self._read(_fetch_all, query, {"param": param})
+
+        generation = self.graph_generation()
+        results = self.result_cache.get((category, param), generation)
+        if results is None:
+            results = self._read(_fetch_all, query, {"param": param})
+            self.result_cache.put((category, param), generation, results)
+        return results
+
+    def find_image_path(self, title: str) -> Optional[str]:
+        record = self._read(_fetch_single, IMAGE_PATH_QUERY, {"title": title})
+        return record["image_path"] if record else None
+
+    def warm_up(self, connections: Optional[int] = None) -> bool:
+        connections = min(connections or 4, self.max_connection_pool_size)
+
+        try:
+            self.neo4j_driver.verify_connectivity()
+
+            # Open several read sessions concurrently so the pool holds live
+            # connections before the first real request arrives.
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(lambda _: self._read(_fetch_single, "RETURN 1 AS ok", {}), range(connections)))
+
+            # Run every lookup once so the server has the plans cached.
+            for query in CATEGORY_QUERIES.values():
+                self._read(_fetch_all, query, {"param": WARM_UP_PARAM})
+            self._read(_fetch_single, IMAGE_PATH_QUERY, {"title": WARM_UP_PARAM})
+            self._read(_fetch_single, GRAPH_GENERATION_QUERY, {})
+
+            print(f"Neo4j pool warmed with {connections} connections")
+            return True
+        except Exception as e:
+            print(f"Neo4j warm-up failed: {str(e)}")
+            traceback.print_exc()
+            return False
+
+    def close(self):
+        self.neo4j_driver.close()
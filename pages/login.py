@@ -1,14 +1,13 @@
 import streamlit as st
 import firebase_admin
-from firebase_admin import credentials, auth
+from firebase_admin import auth
+from firebase_client import get_firebase_app
 
 
 
 
 
-if not firebase_admin._apps:
-    cred = credentials.Certificate("movie-rag-firebase-adminsdk-fbsvc-a46f1f2595.json")
-    firebase_admin.initialize_app(cred)
+get_firebase_app()
 
 def login():
     with st.form("login"):
@@ -0,0 +1,69 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+def normalize_param(param: str) -> str:
+    # The Cypher lookups lowercase both sides, so case and surrounding
+    # whitespace never change the result.
+    return " ".join(str(param).split()).lower()
+
+
+def _estimate_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+class QueryResultCache:
+    # LRU cache bounded by entry count and approximate size. Entries are
+    # tagged with the graph generation they were read from; observing a new
+    # generation drops everything cached before it.
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _observe(self, generation):
+        if generation != self._generation:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation = generation
+
+    def get(self, key: Hashable, generation) -> Optional[Any]:
+        with self._lock:
+            self._observe(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, generation, value: Any):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # A newer generation was seen while this result was being read.
+            if generation != self._generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (generation, value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,280 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+
+# Upper bound in seconds for one recognizer request.
+TRANSCRIPTION_TIMEOUT = 15.0
+
+
+class TranscriptionError(Exception):
+    pass
+
+
+class SpeechNotUnderstoodError(TranscriptionError):
+    pass
+
+
+class SpeechRecognizer:
+    def transcribe(self, wav_bytes: bytes) -> str:
+        raise NotImplementedError
+
+
+class _SpeechRecognitionBackend(SpeechRecognizer):
+    # Decodes the recorded WAV bytes in memory; nothing touches the
+    # microphone or the filesystem.
+    def __init__(self, language: str):
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.language = language
+
+    def _recognize(self, recognizer, audio) -> str:
+        raise NotImplementedError
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        recognizer = self.sr.Recognizer()
+        # Defaults to no timeout, so a stalled request would never return.
+        recognizer.operation_timeout = TRANSCRIPTION_TIMEOUT
+        try:
+            with self.sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+                audio = recognizer.record(source)
+            return self._recognize(recognizer, audio)
+        except self.sr.UnknownValueError as e:
+            raise SpeechNotUnderstoodError(str(e)) from e
+        except (self.sr.RequestError, ValueError, TimeoutError) as e:
+            raise TranscriptionError(str(e)) from e
+
+
+class GoogleRecognizer(_SpeechRecognitionBackend):
+    def __init__(self, language: str = "tr-TR"):
+        super().__init__(language)
+
+    def _recognize(self, recognizer, audio) -> str:
+        return recognizer.recognize_google(audio, language=self.language)
+
+
+class SphinxRecognizer(_SpeechRecognitionBackend):
+    # Offline recognizer (requires pocketsphinx); useful for tests and
+    # environments without network access.
+    def __init__(self, language: str = "en-US"):
+        super().__init__(language)
+
+    def _recognize(self, recognizer, audio) -> str:
+        return recognizer.recognize_sphinx(audio, language=self.language)
+
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "sphinx": SphinxRecognizer,
+}
+
+
+def get_recognizer(name: str = "google", language: Optional[str] = None) -> SpeechRecognizer:
+    if name not in RECOGNIZERS:
+        raise ValueError(f"Unknown speech recognizer: {name}")
+    return RECOGNIZERS[name](language) if language else RECOGNIZERS[name]()
+
+
+class SpeechSynthesizer:
+    name = ""
+    audio_format = "audio/mp3"
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+class GTTSSynthesizer(SpeechSynthesizer):
+    audio_format = "audio/mp3"
+
+    def __init__(self, language: str = "tr"):
+        from gtts import gTTS
+
+        self.gTTS = gTTS
+        self.language = language
+        self.name = f"gtts-{language}"
+
+    def synthesize(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        self.gTTS(text=text, lang=self.language).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Synthesizer(SpeechSynthesizer):
+    # Offline synthesizer. pyttsx3 can only render to a file and its engine
+    # is not thread safe, so calls are serialized through a temp file.
+    audio_format = "audio/wav"
+
+    def __init__(self, language: str = "tr"):
+        import pyttsx3
+
+        self.pyttsx3 = pyttsx3
+        self.language = language
+        # Without a voice for the language the engine's default (usually
+        # English) voice would read the Turkish answers; fail instead.
+        self.voice_id = self._find_voice(language)
+        self.name = f"pyttsx3-{self.voice_id}"
+        self._lock = threading.Lock()
+
+    def _find_voice(self, language: str) -> str:
+        # Voices report languages as e.g. "en_US", "en-us" or b"\x05en-us"
+        # depending on the platform driver; match on the normalized prefix.
+        wanted = language.lower().replace("_", "-")
+        for voice in self.pyttsx3.init().getProperty("voices"):
+            for voice_language in getattr(voice, "languages", None) or []:
+                if isinstance(voice_language, bytes):
+                    voice_language = voice_language.decode("utf-8", "ignore").lstrip("\x05")
+                voice_language = voice_language.lower().replace("_", "-")
+                if voice_language == wanted or voice_language.startswith(wanted + "-"):
+                    return voice.id
+        raise ValueError(f"No pyttsx3 voice installed for language: {language}")
+
+    def synthesize(self, text: str) -> bytes:
+        with self._lock:
+            engine = self.pyttsx3.init()
+            if self.voice_id:
+                engine.setProperty("voice", self.voice_id)
+            fd, path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+            try:
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+
+SYNTHESIZERS = {
+    "gtts": GTTSSynthesizer,
+    "pyttsx3": Pyttsx3Synthesizer,
+}
+
+
+def get_synthesizer(name: str = "gtts", language: Optional[str] = None) -> SpeechSynthesizer:
+    if name not in SYNTHESIZERS:
+        raise ValueError(f"Unknown speech synthesizer: {name}")
+    return SYNTHESIZERS[name](language) if language else SYNTHESIZERS[name]()
+
+
+def speakable_text(text: str) -> str:
+    # Markdown markers would otherwise be read out loud.
+    return re.sub(r"[*_#`>]+", "", text).strip()
+
+
+class SpeechCache:
+    # Synthesized clips keyed by a hash of the synthesizer and the text, kept
+    # on disk and in a byte-bounded in-memory LRU. Synthesis runs on a
+    # background worker so callers never wait for it unless they choose to.
+    def __init__(
+        self,
+        synthesizer: SpeechSynthesizer,
+        cache_dir: str = ".tts_cache",
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_workers: int = 1,
+        retry_backoff: float = 30.0,
+        max_retry_backoff: float = 3600.0,
+    ):
+        self.synthesizer = synthesizer
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._pending: Dict[str, Future] = {}
+        # key -> (consecutive failures, monotonic time before which no retry is made)
+        self._failures: Dict[str, Tuple[int, float]] = {}
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.synthesizer.name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        extension = self.synthesizer.audio_format.split("/")[-1]
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def _remember(self, key: str, audio: bytes):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, text: str) -> Optional[bytes]:
+        key = self._key(text)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                return audio
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, audio)
+        return audio
+
+    def _synthesize(self, key: str, text: str) -> bytes:
+        try:
+            audio = self.synthesizer.synthesize(text)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+            self._remember(key, audio)
+            with self._lock:
+                self._failures.pop(key, None)
+            return audio
+        except Exception as e:
+            print(f"Speech synthesis failed: {str(e)}")
+            with self._lock:
+                failures = self._failures.get(key, (0, 0.0))[0] + 1
+                backoff = min(self.retry_backoff * 2 ** (failures - 1), self.max_retry_backoff)
+                self._failures[key] = (failures, time.monotonic() + backoff)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def pending(self, text: str) -> bool:
+        with self._lock:
+            return self._key(text) in self._pending
+
+    def submit(self, text: str) -> Optional[Future]:
+        # Returns None when there is nothing to synthesize or the text failed
+        # recently and is still backing off; reruns must not retry every time.
+        if not text:
+            return None
+
+        audio = self.get(text)
+        if audio is not None:
+            future = Future()
+            future.set_result(audio)
+            return future
+
+        key = self._key(text)
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is not None and time.monotonic() < failure[1]:
+                return None
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._synthesize, key, text)
+                self._pending[key] = future
+            return future